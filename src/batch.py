@@ -0,0 +1,118 @@
+import numpy as np
+from .pico_y_placa import _encode_plate, _encode_date, _encode_time, _is_holiday, _PEAK, _MASK
+
+try:
+    import numba
+except ImportError:  # numba is optional, without it the rules are applied with vectorized numpy
+    numba = None
+
+
+# Peak hours lookup table indexed by minute of the day
+_PEAK_TABLE = np.frombuffer(_PEAK, dtype=np.uint8)
+
+# Restricted digits bitmask by weekday, weekday 0 is Monday
+_MASK_TABLE = np.array(_MASK, dtype=np.int64)
+
+
+def _predict_vectorized(last_digit, weekday, minute, exempt, holiday, mask, peak):
+    """
+    Applies the Pico y Placa rules to integer-encoded vehicles with whole-array numpy operations
+
+    Parameters
+    ----------
+    last_digit : numpy.ndarray (int8)
+    weekday : numpy.ndarray (int8)
+        0 is Monday, 6 is Sunday
+    minute : numpy.ndarray (int16)
+        minute of the day
+    exempt : numpy.ndarray (bool)
+    holiday : numpy.ndarray (bool)
+    mask : numpy.ndarray (int64)
+        restricted digits by weekday, bit k is set when digit k is restricted
+    peak : numpy.ndarray (uint8)
+        peak hours table indexed by minute of the day
+
+    Returns
+    -------
+    Returns a boolean array, True where the vehicle can be on the road
+    """
+    restricted = (mask[weekday] >> last_digit) & 1
+    return holiday | exempt | (peak[minute] == 0) | (restricted == 0)
+
+
+if numba is not None:
+    @numba.njit(cache=True, parallel=True)
+    def _predict_kernel(last_digit, weekday, minute, exempt, holiday, mask, peak):
+        """
+        Applies the Pico y Placa rules to integer-encoded vehicles, compiled by numba.
+        Same parameters and result as _predict_vectorized
+        """
+        n = last_digit.shape[0]
+        out = np.empty(n, dtype=np.bool_)
+        for i in numba.prange(n):
+            out[i] = (holiday[i] or exempt[i] or peak[minute[i]] == 0 or
+                      (mask[weekday[i]] >> last_digit[i]) & 1 == 0)
+        return out
+else:
+    _predict_kernel = _predict_vectorized
+
+
+def predict_batch(plates, dates, times, holiday_mask=None, online=False):
+    """
+    Checks if each vehicle can be on the road on its date and time, the same as
+    PicoPlaca.predict but for many vehicles at once (e.g., a whole fleet).
+    The strings are validated and encoded as integer arrays in Python, the rules are
+    applied by a numba compiled kernel when numba is installed, otherwise with vectorized numpy.
+
+    Parameters
+    ----------
+    plates : sequence of str
+        plates in the format XX-YYYY or XXX-YYYY
+    dates : sequence of str
+        dates in the format YYYY-MM-DD
+    times : sequence of str
+        times in the format HH:MM
+    holiday_mask : sequence of bool, optional
+        True where the date is a public holiday. If it is not provided the holidays
+        are looked up, only for the vehicles that would otherwise be restricted (default is None)
+    online: boolean, optional
+        if online == True and holiday_mask is not provided, the abstract public holidays API
+        will be used, with one request per distinct date and at most one request per second,
+        so large batches are slow. Consider building holiday_mask instead (default is False)
+
+    Raises
+    ------
+    ValueError
+        If any plate, date or time is not correctly formatted, or the sequences have different lengths
+    requests.HTTPError
+        If the holidays API is used and the API key is missing or the API answers with an error
+
+    Returns
+    -------
+    Returns a numpy boolean array, True where the vehicle can be on the road, otherwise False
+    """
+    n = len(plates)
+    if len(dates) != n or len(times) != n or (holiday_mask is not None and len(holiday_mask) != n):
+        raise ValueError('plates, dates, times and holiday_mask must have the same length')
+
+    last_digit = np.empty(n, dtype=np.int8)
+    weekday = np.empty(n, dtype=np.int8)
+    minute = np.empty(n, dtype=np.int16)
+    exempt = np.empty(n, dtype=np.bool_)
+    # Same validation and encoding as the PicoPlaca setters, the date and time
+    # encoders are cached so each distinct string is parsed only once
+    for i in range(n):
+        last_digit[i], exempt[i] = _encode_plate(plates[i])
+        weekday[i] = _encode_date(dates[i])
+        minute[i] = _encode_time(times[i])
+
+    if holiday_mask is not None:
+        holiday = np.asarray(holiday_mask, dtype=np.bool_)
+        return _predict_kernel(last_digit, weekday, minute, exempt, holiday, _MASK_TABLE, _PEAK_TABLE)
+
+    # As in PicoPlaca.predict, the holidays are checked last: only the dates of the vehicles that
+    # would be restricted are looked up, _is_holiday caches each date and _fetch_holiday throttles the API
+    out = _predict_kernel(last_digit, weekday, minute, exempt, np.zeros(n, dtype=np.bool_), _MASK_TABLE, _PEAK_TABLE)
+    for i in np.flatnonzero(~out):
+        out[i] = _is_holiday(dates[i], online)
+    return out
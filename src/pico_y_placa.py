@@ -1,164 +1,351 @@
 import datetime
-import requests
 import os
 import argparse
 import re
-import json
-from dateutil.easter import easter
-from dateutil.relativedelta import relativedelta as rd, FR
-from holidays.constants import JAN, MAY, AUG, OCT, NOV, DEC
-from holidays.holiday_base import HolidayBase
+import time
+from functools import lru_cache
+
+
+# Validation patterns, compiled once at import time
+_PLATE_RE = re.compile(r'[A-Z]{2,3}-[0-9]{4}')
+_TIME_RE = re.compile(r'(?:[01][0-9]|2[0-3]):[0-5][0-9]')
+
+# Second letters of the plate for vehicles excluded from the restriction (government, official, etc.)
+# https://es.wikipedia.org/wiki/Matr%C3%ADculas_automovil%C3%ADsticas_de_Ecuador
+_EXEMPT_LETTERS = frozenset('AUZEXM')
+
+# Restricted last digits by day of the week (Monday is 0), bit k is set when digit k is restricted
+_MASK = (
+    0b0000000110,  # Monday: 1, 2
+    0b0000011000,  # Tuesday: 3, 4
+    0b0001100000,  # Wednesday: 5, 6
+    0b0110000000,  # Thursday: 7, 8
+    0b1000000001,  # Friday: 9, 0
+    0,  # Saturday
+    0,  # Sunday
+)
+
+# Peak hours (07:00 - 09:30 and 16:00 - 19:30) as minutes of the day
+_MORNING_PEAK = (7 * 60, 9 * 60 + 30)
+_EVENING_PEAK = (16 * 60, 19 * 60 + 30)
+# Lookup table indexed by minute of the day, 1 inside the peak hours
+_PEAK = bytearray(24 * 60)
+for _start, _end in (_MORNING_PEAK, _EVENING_PEAK):
+    _PEAK[_start:_end + 1] = b'\x01' * (_end + 1 - _start)
+_PEAK = bytes(_PEAK)
+
+# Seconds to wait for the holidays API
+_TIMEOUT = 5
+# Minimum seconds between requests to the holidays API, the free version allows 1 request per second
+_MIN_INTERVAL = 1.0
+# time.monotonic() of the last request to the holidays API
+_last_request = None
+
+
+def _parse_iso_date(value):
+    """
+    Parses a date in the ISO 8601 format YYYY-MM-DD by slicing, which is much faster than strptime
+
+    Parameters
+    ----------
+    value : str
+
+    Raises
+    ------
+    ValueError
+        If value string is not formated as YYYY-MM-DD or is not a valid date
+
+    Returns
+    -------
+    Returns the date as a datetime.date
+    """
+    if not (len(value) == 10 and value.isascii() and value[4] == '-' and value[7] == '-' and
+            value[0:4].isdigit() and value[5:7].isdigit() and value[8:10].isdigit()):
+        raise ValueError('The date must be in the following format: YYYY-MM-DD')
+    return datetime.date(int(value[0:4]), int(value[5:7]), int(value[8:10]))
+
+
+def _encode_plate(value):
+    """
+    Validates a plate and derives the features used by the restriction rules
+
+    Parameters
+    ----------
+    value : str
+
+    Raises
+    ------
+    ValueError
+        If value string is not formated as XX-YYYY or XXX-YYYY, where X is a capital letter and Y is a digit
+
+    Returns
+    -------
+    Returns a tuple (last_digit, exempt): the last digit of the plate as an int and
+    True if the vehicle is excluded from the restriction (government, diplomatic, etc.)
+    """
+    if not _PLATE_RE.fullmatch(value):
+        raise ValueError(
+            'The plate must be in the following format: XX-YYYY or XXX-YYYY, where X is a capital letter and Y is a digit')
+    last_digit = ord(value[-1]) - 48  # the pattern guarantees an ASCII digit
+    return last_digit, value[1] in _EXEMPT_LETTERS or value.index('-') == 2
+
+
+@lru_cache(maxsize=1024)
+def _encode_date(value):
+    """
+    Validates a date, cached since a fleet has far fewer distinct dates than vehicles
 
+    Parameters
+    ----------
+    value : str
+
+    Raises
+    ------
+    ValueError
+        If value string is not formated as YYYY-MM-DD (e.g.: 2021-04-02)
 
-class HolidayEcuador(HolidayBase):
+    Returns
+    -------
+    Returns the day of the week as an int, 0 is Monday
     """
-    A class to represent a Holiday in Ecuador by province (HolidayEcuador)
-    It aims to make determining whether a 
-    specific date is a holiday as fast and flexible as possible.
+    try:
+        dt = _parse_iso_date(value)
+    except ValueError:
+        raise ValueError(
+            'The date must be in the following format: YYYY-MM-DD (e.g.: 2021-04-02)') from None
+    return dt.weekday()
+
+
+@lru_cache(maxsize=2048)
+def _encode_time(value):
+    """
+    Validates a time, cached since there are at most 1440 distinct times
+
+    Parameters
+    ----------
+    value : str
+
+    Raises
+    ------
+    ValueError
+        If value string is not formated as HH:MM (e.g., 08:31, 14:22, 00:01)
+
+    Returns
+    -------
+    Returns the minute of the day as an int
+    """
+    if not _TIME_RE.fullmatch(value):
+        raise ValueError(
+            'The time must be in the following format: HH:MM (e.g., 08:31, 14:22, 00:01)')
+    return int(value[0:2]) * 60 + int(value[3:5])
+
+
+@lru_cache(maxsize=128)
+def _easter(year):
+    """
+    Computes the Easter Sunday of a year with the anonymous Gregorian algorithm (Meeus/Jones/Butcher)
+
+    Parameters
+    ----------
+    year : int
+
+    Returns
+    -------
+    Returns the date of Easter Sunday as a datetime.date
+    """
+    a = year % 19
+    b, c = divmod(year, 100)
+    d, e = divmod(b, 4)
+    f = (b + 8) // 25
+    g = (b - f + 1) // 3
+    h = (19 * a + b - d - g + 15) % 30
+    i, k = divmod(c, 4)
+    el = (32 + 2 * e + 2 * i - h - k) % 7
+    m = (a + 11 * h + 22 * el) // 451
+    month, day = divmod(h + el - 7 * m + 114, 31)
+    return datetime.date(year, month, day + 1)
+
+
+def _move_holiday(date):
+    """
+    Moves a holiday according to the Law 858/Reform Law to the LOSEP (in force since December 21, 2016 /R.O # 906)
+
+    Parameters
+    ----------
+    date : datetime.date
+        original date of the holiday
+
+    Returns
+    -------
+    Returns the date on which the mandatory rest takes place
+    """
+    weekday = date.weekday()
+    # If the holiday falls on Saturday or Tuesday the mandatory rest will go to the
+    # immediate previous Friday or Monday respectively
+    if weekday in (5, 1):
+        return date - datetime.timedelta(days=1)
+    # If the holiday falls on Sunday the mandatory rest will go to the following Monday
+    if weekday == 6:
+        return date + datetime.timedelta(days=1)
+    # Holidays that are on Wednesday or Thursday will be moved to the Friday of that week
+    if weekday in (2, 3):
+        return date + datetime.timedelta(days=4 - weekday)
+    return date
+
+
+@lru_cache(maxsize=32)
+def compute_ecuador_holidays(year, prov="EC-P"):
+    """
+    Computes the public holidays of a year in Ecuador by province, only once per year
     https://www.turismo.gob.ec/wp-content/uploads/2020/03/CALENDARIO-DE-FERIADOS.pdf
-    ...
 
-    Attributes (It inherits the HolidayBase class)
+    Parameters
     ----------
-    prov: str
-        province code according to ISO3166-2
+    year : int
+        year whose holidays are computed
+    prov : str, optional
+        province code according to ISO3166-2, only EC-P (Pichincha) has local holidays (default is "EC-P")
+        https://es.wikipedia.org/wiki/ISO_3166-2:EC
 
-    Methods
+    Returns
     -------
-    __init__(self, plate, date, time, online=False):
-        Constructs all the necessary attributes for the HolidayEcuador object.
-    _populate(self, year):
-        Returns if a date is holiday or not
-    """     
-    # ISO 3166-2 codes for the principal subdivisions, called provinces
-    # https://es.wikipedia.org/wiki/ISO_3166-2:EC
-    PROVINCES = ["EC-P"]  # TODO add more provinces
-
-    def __init__(self, **kwargs):
-        """
-        Constructs all the necessary attributes for the HolidayEcuador object.
-        """         
-        self.country = "ECU"
-        self.prov = kwargs.pop("prov", "ON")
-        HolidayBase.__init__(self, **kwargs)
+    Returns a frozenset with the holidays of the year as datetime.date objects
+    """
+    easter = _easter(year)
+    total_lent_days = 46
+    holidays = [
+        datetime.date(year, 1, 1),  # Año Nuevo [New Year's Day]
+        datetime.date(year, 12, 25),  # Navidad [Christmas]
+        easter - datetime.timedelta(days=2),  # Semana Santa (Viernes Santo) [Good Friday]
+        easter,  # Día de Pascuas [Easter Day]
+        easter - datetime.timedelta(days=total_lent_days + 2),  # Lunes de carnaval [Carnival of Monday]
+        easter - datetime.timedelta(days=total_lent_days + 1),  # Martes de carnaval [Tuesday of Carnival]
+    ]
+
+    # Día Nacional del Trabajo [Labour Day], Batalla del Pichincha [Pichincha Battle],
+    # Primer Grito de la Independencia [First Cry of Independence],
+    # Independencia de Guayaquil [Guayaquil's Independence] and, only in Pichincha,
+    # Fundación de Quito [Foundation of Quito] are moved since the reform law
+    movable = [(5, 1), (5, 24), (8, 10), (10, 9)]
+    if prov == "EC-P":
+        movable.append((12, 6))
+    for month, day in movable:
+        date = datetime.date(year, month, day)
+        holidays.append(_move_holiday(date) if year > 2015 else date)
+
+    # Día de los difuntos [Day of the Dead] and Independencia de Cuenca [Independence of Cuenca]
+    # (Law 858/Reform Law to the LOSEP (in force since December 21, 2016 /R.O # 906))
+    # For national and/or local holidays that coincide on continuous days,
+    # the following rules will apply:
+    day_of_dead = datetime.date(year, 11, 2)
+    cuenca = datetime.date(year, 11, 3)
+    weekday = cuenca.weekday()
+    if weekday == 6:
+        day_of_dead -= datetime.timedelta(days=1)
+        cuenca += datetime.timedelta(days=1)
+    elif weekday in (2, 5):
+        cuenca -= datetime.timedelta(days=2)
+    elif weekday in (3, 0):
+        day_of_dead += datetime.timedelta(days=2)
+    holidays += [day_of_dead, cuenca]
+
+    return frozenset(holidays)
+
+
+@lru_cache(maxsize=1)
+def _session():
+    """
+    Creates the HTTP session shared by all the requests to the holidays API, so the connection is kept alive.
+    requests is imported here, so offline predictions never load it
 
-    def _populate(self, year):
-        """
-        Checks if a date is holiday or not
-        
-        Parameters
-        ----------
-        year : str
-            year of a date
+    Returns
+    -------
+    Returns a requests.Session
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    session.mount('https://', HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    return session
+
+
+@lru_cache(maxsize=4096)
+def _fetch_holiday(year, month, day):
+    """
+    Asks the abstract public holidays API if a date is a holiday in Ecuador,
+    caching the answer so a date is requested only once. Requests are at least
+    _MIN_INTERVAL seconds apart to respect the rate limit of the free version
+
+    Parameters
+    ----------
+    year : int
+    month : int
+    day : int
+
+    Raises
+    ------
+    requests.HTTPError
+        If the API key is missing or the API answers with an error
+
+    Returns
+    -------
+    Returns True if the date is a public holiday in Ecuador, otherwise False
+    """
+    import requests
+    global _last_request
+
+    # abstractapi Holidays API, free version: 1000 requests per month
+    # 1 request per second, so consecutive requests are spaced out
+    if _last_request is not None:
+        wait = _last_request + _MIN_INTERVAL - time.monotonic()
+        if wait > 0:
+            time.sleep(wait)
+    _last_request = time.monotonic()
+    # retrieve API key from enviroment variable
+    key = os.environ.get('HOLIDAYS_API_KEY')
+    response = _session().get(
+        "https://holidays.abstractapi.com/v1/?api_key={}&country=EC&year={}&month={:02d}&day={:02d}".format(
+            key, year, month, day),
+        timeout=_TIMEOUT)
+    if (response.status_code == 401):
+        # This means there is a missing API key
+        raise requests.HTTPError(
+            'Missing API key. Store your key in the enviroment variable HOLIDAYS_API_KEY')
+    # Rate limit (429) and server errors also raise requests.HTTPError
+    response.raise_for_status()
+    data = response.json()
+    # if there is no holiday we get an empty array, errors are reported as an object
+    if not isinstance(data, list):
+        raise requests.HTTPError('Unexpected response from the holidays API: {}'.format(data), response=response)
+    # Fix Maundy Thursday incorrectly denoted as holiday
+    return any(holiday.get('name') != 'Maundy Thursday' for holiday in data)
+
+
+@lru_cache(maxsize=512)
+def _is_holiday(date, online):
+    """
+    Checks if date (in ISO 8601 format YYYY-MM-DD) is a public holiday in Ecuador
+    if online == True it will use a REST API, otherwise it will generate the holidays of the examined year.
+    The answer is cached by the date string, so repeated dates are a single dict lookup
+
+    Parameters
+    ----------
+    date : str
+        It is following the ISO 8601 format YYYY-MM-DD: e.g., 2020-04-22
+    online: boolean
+        if online == True the abstract public holidays API will be used
+
+    Returns
+    -------
+    Returns True if the checked date (in ISO 8601 format YYYY-MM-DD) is a public holiday in Ecuador, otherwise False
+    """
+    year, month, day = int(date[0:4]), int(date[5:7]), int(date[8:10])
+    if online:
+        return _fetch_holiday(year, month, day)
+    else:
+        return datetime.date(year, month, day) in compute_ecuador_holidays(year)
 
-        Returns
-        -------
-        Returns true if a date is a holiday otherwise flase 
-        """                    
-        # New Year's Day 
-        self[datetime.date(year, JAN, 1)] = "Año Nuevo [New Year's Day]"
-        
-        # Christmas
-        self[datetime.date(year, DEC, 25)] = "Navidad [Christmas]"
-        
-        # Holy Week
-        self[easter(year) + rd(weekday=FR(-1))] = "Semana Santa (Viernes Santo) [Good Friday)]"
-        self[easter(year)] = "Día de Pascuas [Easter Day]"
-        
-        # Carnival
-        total_lent_days = 46
-        self[easter(year) - datetime.timedelta(days=total_lent_days+2)] = "Lunes de carnaval [Carnival of Monday)]"
-        self[easter(year) - datetime.timedelta(days=total_lent_days+1)] = "Martes de carnaval [Tuesday of Carnival)]"
-        
-        # Labor day
-        name = "Día Nacional del Trabajo [Labour Day]"
-        # (Law 858/Reform Law to the LOSEP (in force since December 21, 2016 /R.O # 906)) If the holiday falls on Saturday or Tuesday
-        # the mandatory rest will go to the immediate previous Friday or Monday
-        # respectively
-        if year > 2015 and datetime.date(year, MAY, 1).weekday() in (5,1):
-            self[datetime.date(year, MAY, 1) - datetime.timedelta(days=1)] = name
-        # (Law 858/Reform Law to the LOSEP (in force since December 21, 2016 /R.O # 906)) if the holiday falls on Sunday
-        # the mandatory rest will go to the following Monday
-        elif year > 2015 and datetime.date(year, MAY, 1).weekday() == 6:
-            self[datetime.date(year, MAY, 1) + datetime.timedelta(days=1)] = name
-        # (Law 858/Reform Law to the LOSEP (in force since December 21, 2016 /R.O # 906)) Holidays that are on Wednesday or Thursday
-        # will be moved to the Friday of that week
-        elif year > 2015 and  datetime.date(year, MAY, 1).weekday() in (2,3):
-            self[datetime.date(year, MAY, 1) + rd(weekday=FR)] = name
-        else:
-            self[datetime.date(year, MAY, 1)] = name
-        
-        # Pichincha battle, the rules are the same as the labor day
-        name = "Batalla del Pichincha [Pichincha Battle]"
-        if year > 2015 and datetime.date(year, MAY, 24).weekday() in (5,1):
-            self[datetime.date(year, MAY, 24).weekday() - datetime.timedelta(days=1)] = name
-        elif year > 2015 and datetime.date(year, MAY, 24).weekday() == 6:
-            self[datetime.date(year, MAY, 24) + datetime.timedelta(days=1)] = name
-        elif year > 2015 and  datetime.date(year, MAY, 24).weekday() in (2,3):
-            self[datetime.date(year, MAY, 24) + rd(weekday=FR)] = name
-        else:
-            self[datetime.date(year, MAY, 24)] = name        
-        
-        # First Cry of Independence, the rules are the same as the labor day
-        name = "Primer Grito de la Independencia [First Cry of Independence]"
-        if year > 2015 and datetime.date(year, AUG, 10).weekday() in (5,1):
-            self[datetime.date(year, AUG, 10)- datetime.timedelta(days=1)] = name
-        elif year > 2015 and datetime.date(year, AUG, 10).weekday() == 6:
-            self[datetime.date(year, AUG, 10) + datetime.timedelta(days=1)] = name
-        elif year > 2015 and  datetime.date(year, AUG, 10).weekday() in (2,3):
-            self[datetime.date(year, AUG, 10) + rd(weekday=FR)] = name
-        else:
-            self[datetime.date(year, AUG, 10)] = name       
-        
-        # Guayaquil's independence, the rules are the same as the labor day
-        name = "Independencia de Guayaquil [Guayaquil's Independence]"
-        if year > 2015 and datetime.date(year, OCT, 9).weekday() in (5,1):
-            self[datetime.date(year, OCT, 9) - datetime.timedelta(days=1)] = name
-        elif year > 2015 and datetime.date(year, OCT, 9).weekday() == 6:
-            self[datetime.date(year, OCT, 9) + datetime.timedelta(days=1)] = name
-        elif year > 2015 and  datetime.date(year, MAY, 1).weekday() in (2,3):
-            self[datetime.date(year, OCT, 9) + rd(weekday=FR)] = name
-        else:
-            self[datetime.date(year, OCT, 9)] = name        
-        
-        # Day of the Dead and
-        namedd = "Día de los difuntos [Day of the Dead]" 
-        # Independence of Cuenca
-        nameic = "Independencia de Cuenca [Independence of Cuenca]"
-        #(Law 858/Reform Law to the LOSEP (in force since December 21, 2016 /R.O # 906)) 
-        #For national and/or local holidays that coincide on continuous days, 
-        #the following rules will apply:
-        if (datetime.date(year, NOV, 2).weekday() == 5 and  datetime.date(year, NOV, 3).weekday() == 6):
-            self[datetime.date(year, NOV, 2) - datetime.timedelta(days=1)] = namedd
-            self[datetime.date(year, NOV, 3) + datetime.timedelta(days=1)] = nameic     
-        elif (datetime.date(year, NOV, 3).weekday() == 2):
-            self[datetime.date(year, NOV, 2)] = namedd
-            self[datetime.date(year, NOV, 3) - datetime.timedelta(days=2)] = nameic
-        elif (datetime.date(year, NOV, 3).weekday() == 3):
-            self[datetime.date(year, NOV, 3)] = nameic
-            self[datetime.date(year, NOV, 2) + datetime.timedelta(days=2)] = namedd
-        elif (datetime.date(year, NOV, 3).weekday() == 5):
-            self[datetime.date(year, NOV, 2)] =  namedd
-            self[datetime.date(year, NOV, 3) - datetime.timedelta(days=2)] = nameic
-        elif (datetime.date(year, NOV, 3).weekday() == 0):
-            self[datetime.date(year, NOV, 3)] = nameic
-            self[datetime.date(year, NOV, 2) + datetime.timedelta(days=2)] = namedd
-        else:
-            self[datetime.date(year, NOV, 2)] = namedd
-            self[datetime.date(year, NOV, 3)] = nameic  
-            
-        # Foundation of Quito, applies only to Pichincha province, 
-        # the rules are the same as the labor day
-        name = "Fundación de Quito [Foundation of Quito]"        
-        if self.prov in ("EC-P"):
-            if year > 2015 and datetime.date(year, DEC, 6).weekday() in (5,1):
-                self[datetime.date(year, DEC, 6) - datetime.timedelta(days=1)] = name
-            elif year > 2015 and datetime.date(year, DEC, 6).weekday() == 6:
-                self[(datetime.date(year, DEC, 6).weekday()) + datetime.timedelta(days=1)] =name
-            elif year > 2015 and  datetime.date(year, DEC, 6).weekday() in (2,3):
-                self[datetime.date(year, DEC, 6) + rd(weekday=FR)] = name
-            else:
-                self[datetime.date(year, DEC, 6)] = name
 
 class PicoPlaca:
     """
@@ -197,34 +384,11 @@ class PicoPlaca:
         Gets the time attribute value
     time(self, value):
         Sets the time attribute value
-    __find_day(self, date):
-        Returns the day from the date: e.g., Wednesday
-    __is_forbidden_time(self, check_time):
-        Returns True if provided time is inside the forbidden peak hours, otherwise False
-    __is_holiday:
-        Returns True if the checked date (in ISO 8601 format YYYY-MM-DD) is a public holiday in Ecuador, otherwise False
     predict(self):
         Returns True if the vehicle with the specified plate can be on the road at the specified date and time, otherwise False
     """ 
-    #Days of the week
-    __days = [
-            "Monday",
-            "Tuesday",
-            "Wednesday",
-            "Thursday",
-            "Friday",
-            "Saturday",
-            "Sunday"]
-
-    # Dictionary that holds the restrictions inf the form {day: forbidden last digit}
-    __restrictions = {
-            "Monday": [1, 2],
-            "Tuesday": [3, 4],
-            "Wednesday": [5, 6],
-            "Thursday": [7, 8],
-            "Friday": [9, 0],
-            "Saturday": [],
-            "Sunday": []}
+    # Fixed attribute layout, instances have no __dict__
+    __slots__ = ('_plate', '_last_digit', '_exempt', '_date', '_weekday', '_time', '_minute', 'online')
 
     def __init__(self, plate, date, time, online=False):
         """
@@ -271,9 +435,8 @@ class PicoPlaca:
         ValueError
             If value string is not formated as XX-YYYY or XXX-YYYY, where X is a capital letter and Y is a digit
         """
-        if not re.match('^[A-Z]{2,3}-[0-9]{4}$', value):
-            raise ValueError(
-                'The plate must be in the following format: XX-YYYY or XXX-YYYY, where X is a capital letter and Y is a digit')
+        # Plate features used by predict, derived once per plate
+        self._last_digit, self._exempt = _encode_plate(value)
         self._plate = value
 
 
@@ -297,13 +460,8 @@ class PicoPlaca:
         ValueError
             If value string is not formated as YYYY-MM-DD (e.g.: 2021-04-02)
         """
-        try:
-            if len(value) != 10:
-                raise ValueError
-            datetime.datetime.strptime(value, "%Y-%m-%d")
-        except ValueError:
-            raise ValueError(
-                'The date must be in the following format: YYYY-MM-DD (e.g.: 2021-04-02)') from None
+        # Day of the week used by predict, computed once per date
+        self._weekday = _encode_date(value)
         self._date = value
         
 
@@ -327,88 +485,11 @@ class PicoPlaca:
         ValueError
             If value string is not formated as HH:MM (e.g., 08:31, 14:22, 00:01)
         """
-        if not re.match('^([01][0-9]|2[0-3]):([0-5][0-9]|)$', value):
-            raise ValueError(
-                'The time must be in the following format: HH:MM (e.g., 08:31, 14:22, 00:01)')
+        # Minute of the day used by predict, computed once per time
+        self._minute = _encode_time(value)
         self._time = value
 
 
-    def __find_day(self, date):
-        """
-        Finds the day from the date: e.g., Wednesday
-
-        Parameters
-        ----------
-        date : str
-            It is following the ISO 8601 format YYYY-MM-DD: e.g., 2020-04-22
-
-        Returns
-        -------
-        Returns the day from the date as a string
-        """        
-        d = datetime.datetime.strptime(date, '%Y-%m-%d').weekday()
-        return self.__days[d]
-
-
-    def __is_forbidden_time(self, check_time):
-        """
-        Checks if the time provided is within the prohibited peak hours,
-        where the peak hours are: 07:00 - 09:30 and 16:00 - 19:30
-
-        Parameters
-        ----------
-        check_time : str
-            Time that will be checked. It is in format HH:MM: e.g., 08:35, 19:15
-
-        Returns
-        -------
-        Returns True if provided time is inside the forbidden peak hours, otherwise False
-        """           
-        t = datetime.datetime.strptime(check_time, '%H:%M').time()
-        return ((t >= datetime.time(7, 0) and t <= datetime.time(9, 30)) or
-                (t >= datetime.time(16, 0) and t <= datetime.time(19, 30)))
-
-
-    def __is_holiday(self, date, online):
-        """
-        Checks if date (in ISO 8601 format YYYY-MM-DD) is a public holiday in Ecuador
-        if online == True it will use a REST API, otherwise it will generate the holidays of the examined year
-        
-        Parameters
-        ----------
-        date : str
-            It is following the ISO 8601 format YYYY-MM-DD: e.g., 2020-04-22
-        online: boolean, optional
-            if online == True the abstract public holidays API will be used        
-
-        Returns
-        -------
-        Returns True if the checked date (in ISO 8601 format YYYY-MM-DD) is a public holiday in Ecuador, otherwise False
-        """            
-        y, m, d = date.split('-')
-
-        if online:
-            # abstractapi Holidays API, free version: 1000 requests per month
-            # 1 request per second
-            # retrieve API key from enviroment variable
-            key = os.environ.get('HOLIDAYS_API_KEY')
-            response = requests.get(
-                "https://holidays.abstractapi.com/v1/?api_key={}&country=EC&year={}&month={}&day={}".format(key, y, m, d))
-            if (response.status_code == 401):
-                # This means there is a missing API key
-                raise requests.HTTPError(
-                    'Missing API key. Store your key in the enviroment variable HOLIDAYS_API_KEY')
-            if response.content == b'[]':  # if there is no holiday we get an empty array
-                return False
-            # Fix Maundy Thursday incorrectly denoted as holiday
-            if json.loads(response.text[1:-1])['name'] == 'Maundy Thursday':
-                return False
-            return True
-        else:
-            ecu_holidays = HolidayEcuador(prov='EC-P')
-            return date in ecu_holidays
-
-
     def predict(self):
         """
         Checks if vehicle with the specified plate can be on the road on the provided date and time based on the Pico y Placa rules:
@@ -418,25 +499,24 @@ class PicoPlaca:
         -------
         Returns True if the vehicle with the specified plate can be on the road at the specified date and time, otherwise False
         """
-        # Check if date is a holiday
-        if self.__is_holiday(self.date, self.online):
-            return True
+        # The cheap string checks go first, so the holiday lookup (which may
+        # need a request to the API) only runs for otherwise restricted vehicles
 
         # Check for restriction-excluded vehicles according to the second letter of the plate or if using only two letters
         # https://es.wikipedia.org/wiki/Matr%C3%ADculas_automovil%C3%ADsticas_de_Ecuador
-        if self.plate[1] in 'AUZEXM' or len(self.plate.split('-')[0]) == 2:
+        if self._exempt:
             return True
 
-        # Check if provided time is not in the forbidden peak hours
-        if not self.__is_forbidden_time(self.time):
+        # Check if provided time is not in the forbidden peak hours: 07:00 - 09:30 and 16:00 - 19:30
+        if not _PEAK[self._minute]:
             return True
 
-        day = self.__find_day(self.date)  # Find day of the week from date
         # Check if last digit of the plate is not restricted in this particular day
-        if int(self.plate[-1]) not in self.__restrictions[day]:
+        if not (_MASK[self._weekday] >> self._last_digit) & 1:
             return True
 
-        return False
+        # Check if date is a holiday
+        return _is_holiday(self.date, self.online)
 
 
 if __name__ == '__main__':
@@ -1,149 +1,189 @@
 import unittest
+from unittest import mock
 import requests
 import os
 from datetime import datetime
+from src import pico_y_placa
 from src.pico_y_placa import PicoPlaca
+try:
+    from src import batch
+    from src.batch import predict_batch
+except ImportError:  # numpy is not installed
+    predict_batch = None
+
+
+# (plate, date, time, expected result, description)
+PREDICT_CASES = [
+    ('EBA-0239', '2021-04-30', '17:00', True,
+     'moved new holidays are not restricted: moved Labour Day, Friday, plate prohibited on Fridays'),
+    ('EBA-0234', '2021-08-10', '17:00', False,
+     'moved would-have-been holidays are restricted: First Cry of Independence moved, Tuesday'),
+    ('EBA-0236', '2021-11-03', '17:00', False,
+     'moved would-have-been continuous holidays are restricted: Independence of Cuenca moved, Wednesday'),
+    ('EBA-0231', '2022-05-23', '17:00', True,
+     'holidays moved from a Tuesday to the previous Monday are not restricted: moved Pichincha Battle'),
+    ('EBA-0234', '2021-04-25', '17:00', True,
+     'weekends are not restricted: Sunday within peak hours'),
+    ('EBA-0234', '2021-04-27', '20:00', True,
+     'time outside of peak hours is not restricted: Tuesday, plate prohibited on Tuesdays'),
+    ('AEC-0234', '2021-04-27', '17:00', True,
+     'governmental vehicles are not restricted'),
+    ('CD-0234', '2021-04-27', '17:00', True,
+     'diplomatic vehicles are not restricted'),
+    ('EBA-0234', '2021-04-27', '17:00', False,
+     'restricted case: plates ending with 4 are restricted on Tuesdays within peak hours'),
+]
+
+
+def clear_holiday_caches():
+    """
+    Clears the module-level holiday caches, so a test does not depend on the answers of another one
+    """
+    pico_y_placa._is_holiday.cache_clear()
+    pico_y_placa._fetch_holiday.cache_clear()
 
 
 class TestPicoYPlaca(unittest.TestCase):
 
-    def test_invalid_plate(self):
+    # Fixed timestamp, so the inputs do not depend on when the tests run
+    NOW = datetime(2024, 1, 1, 12, 0)
+
+    def test_invalid_input(self):
         """
-        Test that invalid plate raises ValueError
+        Test that invalid plate, date or time raises ValueError
         """
-        plate = 'A-123'
-        now = datetime.now()
+        now = self.NOW
         date, tm = now.strftime("%Y-%m-%d %H:%M").split()
-        with self.assertRaises(ValueError):
-            result = PicoPlaca(plate, date, tm).predict()
+        cases = [
+            ('A-123', date, tm),  # invalid plate
+            ('EBA-0234', now.strftime("%d/%m/%Y"), tm),  # invalid date
+            ('EBA-0234', date, now.strftime("%H:%M:%S")),  # time with seconds
+            ('EBA-0234', '2021-04-27', '17:'),  # time without minutes
+            ('EBA-0234', '2021-04-27', '17:00\n'),  # time followed by a newline
+        ]
+        for plate, date, tm in cases:
+            with self.subTest(plate=plate, date=date, time=tm):
+                with self.assertRaises(ValueError):
+                    PicoPlaca(plate, date, tm).predict()
 
     
-    def test_invalid_date(self):
+    def test_missing_key(self):
         """
-        Test that invalid date raises ValueError
+        Test that missing API key raises requests.HTTPError
         """
-        plate = 'EBA-0234'  # private vehicle
-        now = datetime.now()
-        date, tm = now.strftime("%d/%m/%Y %H:%M").split()
-        with self.assertRaises(ValueError):
-            result = PicoPlaca(plate, date, tm).predict()
+        date = '2021-04-27'  # Tuesday
+        plate = 'EBA-0234'  # private vehicles' plates ending with 4 are restricted on Tuesdays
+        tm = '17:00'  # within peak hours, so the holidays API has to be consulted
+        # A cached answer would skip the API
+        clear_holiday_caches()
+        # The environment is restored when the test finishes
+        with mock.patch.dict(os.environ):
+            os.environ.pop('HOLIDAYS_API_KEY', None)
+            with self.assertRaises(requests.HTTPError):
+                result = PicoPlaca(plate, date, tm, online=True).predict()
 
-    
-    def test_invalid_time(self):
-        """
-        Test that invalid time raises ValueError
-        """
-        plate = 'EBA-0234'  # private vehicle
-        now = datetime.now()
-        date, tm = now.strftime("%Y-%m-%d %H:%M:%S").split()
-        with self.assertRaises(ValueError):
-            result = PicoPlaca(plate, date, tm).predict()
 
-    
-    def test_missing_key(self):
+    def test_api_error(self):
         """
-        Test that missing API key raises requests.HTTPError
+        Test that an error answer of the holidays API (e.g., rate limit) raises requests.HTTPError
         """
-        plate = 'EBA-0234'  # private vehicle
-        now = datetime.now()
-        date, tm = now.strftime("%Y-%m-%d %H:%M").split()
-        try:
-            del os.environ['HOLIDAYS_API_KEY']
-        except KeyError:
-            pass
-        with self.assertRaises(requests.HTTPError):
-            result = PicoPlaca(plate, date, tm, online=True).predict()
+        response = mock.Mock(status_code=429)
+        response.raise_for_status.side_effect = requests.HTTPError('429 Too Many Requests')
+        response.json.return_value = {'error': {'message': 'Too many requests'}}
+        clear_holiday_caches()
+        self.addCleanup(clear_holiday_caches)
+        with mock.patch.object(pico_y_placa, '_session') as session, \
+                mock.patch.object(pico_y_placa, '_last_request', None):
+            session.return_value.get.return_value = response
+            with self.assertRaises(requests.HTTPError):
+                PicoPlaca('EBA-0234', '2021-04-27', '17:00', online=True).predict()
 
 
-    def test_holiday(self):
+    def test_predict(self):
         """
-        Test that moved new holidays are restricted
+        Test the holidays, weekends, peak hours, excluded vehicles and restricted cases
         """
-        date = '2021-04-30'  # Moved Labour Day, Friday
-        plate = "EBA-0239"  # private vehicle prohibited on Fridays
-        tm = '17:00'  # within peak hours
-        result = PicoPlaca(plate, date, tm).predict()
-        self.assertTrue(result)
+        for plate, date, tm, expected, description in PREDICT_CASES:
+            with self.subTest(description, plate=plate, date=date, time=tm):
+                self.assertEqual(PicoPlaca(plate, date, tm).predict(), expected)
 
 
-    def test_holiday2(self):
+    def test_slots(self):
         """
-        Test that moved would-have-been holidays are not restricted
+        Test that PicoPlaca instances have a fixed layout without __dict__
         """
-        date = '2021-08-10'  # Would have been First Cry of Independence - moved, Tuesday
-        plate = "EBA-0234"  # private vehicle prohibited on Tuesdays
-        tm = '17:00'  # within peak hours
-        result = PicoPlaca(plate, date, tm).predict()
-        self.assertFalse(result)
+        pyp = PicoPlaca('EBA-0234', '2021-04-27', '17:00')
+        self.assertFalse(hasattr(pyp, '__dict__'))
+        with self.assertRaises(AttributeError):
+            pyp.color = 'red'
+
 
 
-    def test_holiday3(self):
+@unittest.skipIf(predict_batch is None, 'numpy is required for batch predictions')
+class TestPredictBatch(unittest.TestCase):
+
+    def test_matches_predict(self):
         """
-        Test that moved would-have-been continuous holidays are not restricted
+        Test that batch predictions agree with PicoPlaca.predict
         """
-        date = '2021-11-03'  # Would have been Independence of Cuenca - moved, Wednesday
-        plate = "EBA-0236"  # private vehicle prohibited on Wednesdays
-        tm = '17:00'  # within peak hours
-        result = PicoPlaca(plate, date, tm).predict()
-        self.assertFalse(result)
+        plates, dates, times, expected, _ = zip(*PREDICT_CASES)
+        result = predict_batch(plates, dates, times)
+        self.assertEqual(result.tolist(), list(expected))
 
 
-    def test_weekend(self):
+    def test_vectorized(self):
         """
-        Test that weekends are not restricted
+        Test that the numpy rules, used when numba is not installed, agree with PicoPlaca.predict
         """
-        date = '2021-04-25'  # Sunday
-        plate = 'EBA-0234'  # private vehicle
-        tm = '17:00'  # within peak hours
-        result = PicoPlaca(plate, date, tm).predict()
-        self.assertTrue(result)
+        plates, dates, times, expected, _ = zip(*PREDICT_CASES)
+        with mock.patch.object(batch, '_predict_kernel', batch._predict_vectorized):
+            result = predict_batch(plates, dates, times)
+        self.assertEqual(result.tolist(), list(expected))
 
 
-    def test_outside_peak_hours(self):
+    def test_holiday_mask(self):
         """
-        Test that time outside of not peak hours are not restricted
+        Test that the provided holiday mask is used
         """
-        date = '2021-04-27'  # Tuesday
-        plate = 'EBA-0234'  # private vehicle prohibited on Tuesdays
-        tm = '20:00'  # outside peak hours
-        result = PicoPlaca(plate, date, tm).predict()
-        self.assertTrue(result)
+        result = predict_batch(['EBA-0234', 'EBA-0234'], ['2021-04-27', '2021-04-27'], ['17:00', '17:00'], [True, False])
+        self.assertEqual(result.tolist(), [True, False])
 
 
-    def test_vehicle(self):
+    def test_online_not_needed(self):
         """
-        Test that governemental vehicles are not restricted
+        Test that the holidays API is not used when no vehicle would be restricted
         """
-        date = '2021-04-27'  # Tuesday
-        # Governmental vehicle, plate ending in 4 (normally restricted on Mondays)
-        plate = 'AEC-0234'
-        tm = '17:00'  # within peak hours
-        result = PicoPlaca(plate, date, tm).predict()
-        self.assertTrue(result)
+        result = predict_batch(['AEC-0234', 'EBA-0234'], ['2021-04-27', '2021-04-27'], ['17:00', '12:00'], online=True)
+        self.assertEqual(result.tolist(), [True, True])
 
 
-    def test_vehicle2(self):
+    def test_online_throttled(self):
         """
-        Test that diplomatic vehicles are not restricted
+        Test that the holidays API is asked once per distinct date, with the requests spaced out
         """
-        date = '2021-04-27'  # Tuesday
-        # Governmental vehicle, plate ending in 4 (normally restricted on Mondays)
-        plate = 'CD-0234'
-        tm = '17:00'  # within peak hours
-        result = PicoPlaca(plate, date, tm).predict()
-        self.assertTrue(result)
+        response = mock.Mock(status_code=200)
+        response.json.return_value = []
+        clear_holiday_caches()
+        self.addCleanup(clear_holiday_caches)
+        with mock.patch.object(pico_y_placa, '_session') as session, \
+                mock.patch.object(pico_y_placa, '_last_request', None), \
+                mock.patch.object(pico_y_placa.time, 'monotonic', return_value=100.0), \
+                mock.patch.object(pico_y_placa.time, 'sleep') as sleep:
+            session.return_value.get.return_value = response
+            result = predict_batch(['EBA-0234', 'EBA-0234', 'EBA-0231'],
+                                   ['2021-04-27', '2021-04-27', '2021-04-26'], ['17:00', '17:30', '17:00'], online=True)
+        self.assertEqual(result.tolist(), [False, False, False])
+        self.assertEqual(session.return_value.get.call_count, 2)
+        sleep.assert_called_once_with(pico_y_placa._MIN_INTERVAL)
 
 
-    def test_restricted(self):
+    def test_invalid_plate(self):
         """
-        Test restricted case
+        Test that an invalid plate in the batch raises ValueError
         """
-        date = '2021-04-27'  # Tuesday
-        plate = 'EBA-0234'  # private vehicles' plates ending with 4 are restricted on Tuesdays
-        tm = '17:00'  # within peak hours
-        result = PicoPlaca(plate, date, tm).predict()
-        self.assertFalse(result)
-        
+        with self.assertRaises(ValueError):
+            predict_batch(['EBA-0234', 'A-123'], ['2021-04-27', '2021-04-27'], ['17:00', '17:00'])
+
 
 if __name__ == '__main__':
     unittest.main()